@@ -0,0 +1,268 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from datetime import date, datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# brotli ships in requirements.txt; if it is missing locally, only gzip
+# variants are published
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+API_DIR = 'api'
+DATE_DIR_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Past dated snapshots never change once published; "latest" and today's
+# snapshot must be revalidated
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+LATEST_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+CONTENT_TYPES = {
+    '.json': 'application/json; charset=utf-8',
+    '.geojson': 'application/geo+json; charset=utf-8',
+}
+COMPRESSIBLE_EXTENSIONS = tuple(CONTENT_TYPES)
+
+# (Accept-Encoding token, file suffix), in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def clean_value(value, default=None):
+    # Rows loaded through pandas (CSV/XLSX fallbacks) hold NaN for missing cells
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return default
+    return value
+
+
+def parse_point(point):
+    # The API returns "[lon,lat]" strings; cached CSV/XLSX rows may hold lists
+    if isinstance(point, str):
+        try:
+            point = json.loads(point)
+        except ValueError:
+            return None
+    if isinstance(point, (list, tuple)) and len(point) == 2:
+        try:
+            coords = [float(point[0]), float(point[1])]
+        except (TypeError, ValueError):
+            return None
+        if all(math.isfinite(c) for c in coords):
+            return coords
+    return None
+
+
+def build_aggregates(disruptions) -> dict:
+    severity_counts = Counter(clean_value(d.get('severity'), 'Unknown severity') for d in disruptions)
+    category_counts = Counter(clean_value(d.get('category'), 'Unknown category') for d in disruptions)
+
+    hourly = [0] * 24
+    for d in disruptions:
+        try:
+            hourly[datetime.strptime(d['startDateTime'], '%Y-%m-%dT%H:%M:%S%z').hour] += 1
+        except (KeyError, TypeError, ValueError):
+            continue
+
+    features = []
+    for d in disruptions:
+        coords = parse_point(d.get('point'))
+        if coords is None:
+            continue
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': coords},
+            'properties': {
+                key: clean_value(d.get(key))
+                for key in ('id', 'severity', 'category', 'subCategory', 'comments')
+            },
+        })
+
+    return {
+        'summary.json': {
+            'total': len(disruptions),
+            'severity': dict(severity_counts.most_common()),
+            'category': dict(category_counts.most_common()),
+        },
+        'hourly.json': {'hours': list(range(24)), 'counts': hourly},
+        'points.geojson': {'type': 'FeatureCollection', 'features': features},
+    }
+
+
+def encode_json(data_obj) -> bytes:
+    # Compact, NaN-free output; key order follows build_aggregates (counts are
+    # most common first), so unchanged data keeps the same ETag across runs
+    return json.dumps(data_obj, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_precompressed(path: str, body: bytes) -> None:
+    with open(path, 'wb') as fobj:
+        fobj.write(body)
+    # mtime=0 keeps gzip output byte-identical for identical input
+    with open(path + '.gz', 'wb') as fobj:
+        fobj.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as fobj:
+            fobj.write(brotli.compress(body, quality=11))
+
+
+def publish_api(disruptions, snapshot_date: str, archives, api_dir: str = API_DIR) -> None:
+    aggregates = build_aggregates(disruptions)
+    targets = ['latest']
+    # Like data/<date>/, the dated snapshot tracks the latest run of its day; an
+    # empty fallback never replaces it. It is only served as immutable once the
+    # day has passed and main.py no longer writes it.
+    if disruptions:
+        targets.append(snapshot_date)
+    for target in targets:
+        target_dir = os.path.join(api_dir, target)
+        os.makedirs(target_dir, exist_ok=True)
+        for name, payload in aggregates.items():
+            write_precompressed(os.path.join(target_dir, name), encode_json(payload))
+
+    listing = [
+        {
+            'date': d,
+            'summary': f'{d}/summary.json',
+            'hourly': f'{d}/hourly.json',
+            'points': f'{d}/points.geojson',
+            'report': f'../data/{d}/index.html',
+        }
+        for d in archives
+        if os.path.isdir(os.path.join(api_dir, d))
+    ]
+    write_precompressed(os.path.join(api_dir, 'archives.json'), encode_json(listing))
+
+
+def compute_etag(path: str) -> str:
+    with open(path, 'rb') as fobj:
+        return '"' + hashlib.sha256(fobj.read()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match (RFC 9110 13.1.2)
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        token, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if token:
+            qvalues[token.strip().lower()] = q
+    # "*" covers any coding not listed explicitly, so "br;q=0, *" still excludes br
+    wildcard = qvalues.get('*', 0.0)
+    return {token for token, _ in ENCODINGS if qvalues.get(token, wildcard) > 0}
+
+
+class ApiRequestHandler(SimpleHTTPRequestHandler):
+    # Caches one ETag per path, rehashing only when its (mtime, size) changes
+    etag_cache = {}
+
+    def do_GET(self):
+        self.serve_api(head_only=False)
+
+    def do_HEAD(self):
+        self.serve_api(head_only=True)
+
+    def serve_api(self, head_only: bool) -> None:
+        path = self.translate_path(self.path)
+        if not path.endswith(COMPRESSIBLE_EXTENSIONS) or not os.path.isfile(path):
+            # Directory listings and anything else fall back to the stock handler
+            if head_only:
+                super().do_HEAD()
+            else:
+                super().do_GET()
+            return
+
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        encoding, file_path = None, path
+        for token, suffix in ENCODINGS:
+            if token in accepted and os.path.isfile(path + suffix):
+                encoding, file_path = token, path + suffix
+                break
+
+        etag = self.get_etag(file_path)
+        rel_parts = os.path.relpath(path, self.directory).split(os.sep)
+        today = date.today().isoformat()
+        immutable = any(DATE_DIR_RE.match(part) and part != today for part in rel_parts[:-1])
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and etag_matches(if_none_match, etag):
+            self.send_response(304)
+            self.send_cache_headers(etag, immutable)
+            self.end_headers()
+            return
+
+        with open(file_path, 'rb') as fobj:
+            body = fobj.read()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[os.path.splitext(path)[1]])
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_cache_headers(etag, immutable)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def send_cache_headers(self, etag: str, immutable: bool) -> None:
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', IMMUTABLE_CACHE_CONTROL if immutable else LATEST_CACHE_CONTROL)
+
+    def get_etag(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.etag_cache.get(file_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        etag = compute_etag(file_path)
+        self.etag_cache[file_path] = (version, etag)
+        return etag
+
+
+def serve(directory: str = '.', host: str = '127.0.0.1', port: int = 8000) -> None:
+    directory = os.path.abspath(directory)
+
+    def handler(*args, **kwargs):
+        return ApiRequestHandler(*args, directory=directory, **kwargs)
+
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Serving {directory} at http://{host}:{port}/ (API under /{API_DIR}/)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the site and precomputed JSON API locally.')
+    parser.add_argument('--directory', default='.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    serve(args.directory, args.host, args.port)
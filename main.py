@@ -12,6 +12,7 @@ from time import sleep
 import folium
 import json
 from shutil import copyfile
+from api import publish_api
 
 # Load YAML data for severity levels
 with open('road_severity_levels.yaml', 'r') as file:
@@ -348,6 +349,13 @@ if today_str not in archives:
     archives.sort(reverse=True)
     write_json(archives_index_path, archives)
 
+# Publish precomputed JSON aggregates (with .gz/.br variants) under api/
+try:
+    publish_api(disruptions, today_str, archives)
+    print("JSON API aggregates published under 'api/'.")
+except Exception as e:
+    print(f"Failed to publish API aggregates: {e}")
+
 # Generate a simple archives.html page
 archives_items = '\n'.join(
     [f'<li><a href="data/{d}/index.html">{d} report</a> — '
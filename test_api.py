@@ -0,0 +1,152 @@
+import gzip
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from datetime import date
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert api.etag_matches('"abc"', etag)
+    assert api.etag_matches('W/"abc"', etag)
+    assert api.etag_matches('"xyz", W/"abc"', etag)
+    assert api.etag_matches('*', etag)
+    assert not api.etag_matches('"xyz"', etag)
+    assert not api.etag_matches('W/"xyz", "abcd"', etag)
+
+
+def test_accepted_encodings():
+    assert api.accepted_encodings('gzip, deflate, br') == {'gzip', 'br'}
+    assert api.accepted_encodings('gzip;q=0.5, br;q=0') == {'gzip'}
+    assert api.accepted_encodings('*') == {'gzip', 'br'}
+    assert api.accepted_encodings('br;q=0, *') == {'gzip'}
+    assert api.accepted_encodings('*;q=0') == set()
+    assert api.accepted_encodings('') == set()
+
+
+def test_parse_point():
+    assert api.parse_point('[-0.104471,51.531547]') == [-0.104471, 51.531547]
+    assert api.parse_point([-0.1, 51.5]) == [-0.1, 51.5]
+    assert api.parse_point(float('nan')) is None
+    assert api.parse_point('[NaN, 51.5]') is None
+    assert api.parse_point('not a point') is None
+    assert api.parse_point([1, 2, 3]) is None
+
+
+def test_build_aggregates_handles_nan_rows():
+    disruptions = [
+        {'id': 'A', 'severity': 'Serious', 'category': 'Works', 'point': '[-0.1,51.5]',
+         'startDateTime': '2025-01-23T08:00:00Z', 'comments': float('nan')},
+        {'id': 'B', 'severity': float('nan'), 'category': 'Works', 'point': float('nan'),
+         'startDateTime': '2025-01-23T08:30:00Z'},
+        {'id': 'C', 'severity': 'Moderate', 'category': float('nan'),
+         'startDateTime': float('nan')},
+    ]
+    aggregates = api.build_aggregates(disruptions)
+    summary = aggregates['summary.json']
+    assert summary['total'] == 3
+    assert summary['severity'] == {'Serious': 1, 'Unknown severity': 1, 'Moderate': 1}
+    assert list(summary['category']) == ['Works', 'Unknown category']
+    assert aggregates['hourly.json']['counts'][8] == 2
+    features = aggregates['points.geojson']['features']
+    assert [f['properties']['id'] for f in features] == ['A']
+    assert features[0]['properties']['comments'] is None
+    for payload in aggregates.values():
+        json.loads(api.encode_json(payload))
+
+
+def test_publish_api_dated_snapshots(tmp_path):
+    api_dir = str(tmp_path)
+    first = [{'id': 'A', 'severity': 'Serious'}]
+    second = first + [{'id': 'B', 'severity': 'Minimal'}]
+
+    api.publish_api([], '2025-01-01', ['2025-01-01'], api_dir)
+    assert not os.path.exists(os.path.join(api_dir, '2025-01-01'))
+
+    api.publish_api(first, '2025-01-01', ['2025-01-01', '2024-12-01'], api_dir)
+    api.publish_api(second, '2025-01-01', ['2025-01-01', '2024-12-01'], api_dir)
+    api.publish_api([], '2025-01-01', ['2025-01-01', '2024-12-01'], api_dir)
+
+    with open(os.path.join(api_dir, '2025-01-01', 'summary.json'), encoding='utf-8') as fobj:
+        assert json.load(fobj)['total'] == 2
+    with open(os.path.join(api_dir, 'latest', 'summary.json'), encoding='utf-8') as fobj:
+        assert json.load(fobj)['total'] == 0
+    with open(os.path.join(api_dir, 'archives.json'), encoding='utf-8') as fobj:
+        assert [entry['date'] for entry in json.load(fobj)] == ['2025-01-01']
+
+
+@pytest.fixture
+def server_url(tmp_path):
+    api_dir = str(tmp_path / api.API_DIR)
+    api.publish_api([{'id': 'A', 'severity': 'Serious'}], '2025-01-01', ['2025-01-01'], api_dir)
+    api.publish_api([{'id': 'A', 'severity': 'Serious'}], date.today().isoformat(), [], api_dir)
+
+    handler_cls = type('QuietHandler', (api.ApiRequestHandler,), {'log_message': lambda *args: None})
+
+    def quiet_handler(*args, **kwargs):
+        return handler_cls(*args, directory=str(tmp_path), **kwargs)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), quiet_handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(url, **headers):
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as err:
+        return err.code, err.headers, err.read()
+
+
+def test_handler_round_trip(server_url):
+    url = f'{server_url}/api/latest/summary.json'
+    status, headers, body = fetch(url, **{'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Cache-Control'] == api.LATEST_CACHE_CONTROL
+    assert json.loads(gzip.decompress(body))['total'] == 1
+
+    status, headers_304, body = fetch(url, **{'Accept-Encoding': 'gzip', 'If-None-Match': headers['ETag']})
+    assert status == 304
+    assert body == b''
+    assert headers_304['ETag'] == headers['ETag']
+
+    status, headers, body = fetch(url)
+    assert status == 200
+    assert headers['Content-Encoding'] is None
+    assert json.loads(body)['total'] == 1
+
+
+def test_handler_cache_headers_for_dated_snapshots(server_url):
+    status, headers, _ = fetch(f'{server_url}/api/2025-01-01/points.geojson', **{'Accept-Encoding': '*'})
+    assert status == 200
+    assert headers['Content-Encoding'] in ('br', 'gzip')
+    assert headers['Cache-Control'] == api.IMMUTABLE_CACHE_CONTROL
+    assert headers['Content-Type'] == 'application/geo+json; charset=utf-8'
+
+
+def test_handler_revalidates_todays_snapshot(server_url):
+    status, headers, _ = fetch(f'{server_url}/api/{date.today().isoformat()}/summary.json')
+    assert status == 200
+    assert headers['Cache-Control'] == api.LATEST_CACHE_CONTROL
+
+
+def test_etag_cache_keeps_one_entry_per_path(server_url, tmp_path):
+    path = str(tmp_path / api.API_DIR / 'latest' / 'summary.json')
+    _, headers, _ = fetch(f'{server_url}/api/latest/summary.json')
+    api.publish_api([{'id': 'A'}, {'id': 'B'}], '2025-01-02', [], str(tmp_path / api.API_DIR))
+    _, new_headers, _ = fetch(f'{server_url}/api/latest/summary.json')
+    assert new_headers['ETag'] != headers['ETag']
+    assert api.ApiRequestHandler.etag_cache[path][1] == new_headers['ETag']